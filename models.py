@@ -1,5 +1,28 @@
+import numpy as np
+
 import nn
 
+try:
+    import models_fast
+except ImportError:
+    models_fast = None
+
+try:
+    import perceptron_train  # built from perceptron_train.pyx
+except ImportError:
+    perceptron_train = None
+
+def sgd_update(params, grads, multiplier):
+    """
+    Applies param += multiplier * grad across a whole parameter list in one
+    pass, skipping the per-call checks of nn.Parameter.update. The gradient
+    arrays are consumed as scratch for the scaled values, so no temporaries
+    are allocated; callers must not reuse them afterwards.
+    """
+    for param, grad in zip(params, grads):
+        np.multiply(grad.data, multiplier, out=grad.data)
+        param.data += grad.data
+
 class PerceptronModel(object):
     def __init__(self, dimensions):
         """
@@ -11,6 +34,9 @@ class PerceptronModel(object):
         2D points.
         """
         self.w = nn.Parameter(1, dimensions)
+        # Numpy view aliasing the Parameter storage, so that in-place updates
+        # made during training are visible through `self.w` as well.
+        self._w_np = self.w.data
 
     def get_weights(self):
         """
@@ -28,31 +54,57 @@ class PerceptronModel(object):
         """
         return nn.DotProduct(self.w, x)
 
+    @staticmethod
+    def _classify(scores):
+        """
+        Branchless sign rule mapping an array of raw scores to classes,
+        with scores of exactly zero classified as +1.
+        """
+        return np.where(scores < 0, -1.0, 1.0)
+
     def get_prediction(self, x):
         """
         Calculates the predicted class for a single data point `x`.
 
         Returns: 1 or -1
         """
-        if nn.as_scalar(self.run(x)) < 0.0:
-            return -1
-        else:
-            return 1
+        return int(self._classify(self.run(x).data).item())
 
     def train(self, dataset):
         """
         Train the perceptron until convergence.
+
+        The dataset is materialized into two numpy arrays up front, so each
+        epoch is a single matrix-vector product plus one batched update over
+        the misclassified points, instead of one graph evaluation per sample.
         """
-        
-        while 1:
-            continuing = 1
-            for x, y in dataset.iterate_once(1):
-                temp = nn.as_scalar(y)
-                if self.get_prediction(x) != temp:
-                    nn.Parameter.update(self.w, x, temp)
-                    continuing = -1
-            if continuing>0:
+        xs = []
+        ys = []
+        for x, y in dataset.iterate_once(1):
+            xs.append(x.data)
+            ys.append(nn.as_scalar(y))
+        X = np.vstack(xs)
+        Y = np.array(ys)
+
+        # Convergence is a mispredict count of zero, read off the same mask
+        # that drives the update. The epoch cap keeps a non-separable input
+        # from hanging forever.
+        max_epochs = 10000
+
+        # When the Cython extension is built, run the whole epoch loop in C
+        # with per-sample updates; the weights are trained in place through
+        # the aliased view.
+        if perceptron_train is not None:
+            perceptron_train.train(X, Y, self._w_np.ravel(), max_epochs)
+            return
+
+        for epoch in range(max_epochs):
+            scores = np.dot(X, self._w_np.T).ravel()
+            pred = self._classify(scores)
+            mis = pred != Y
+            if mis.sum() == 0:
                 break
+            self._w_np += np.dot(Y[mis], X[mis])
 
 class RegressionModel(object):
     """
@@ -63,7 +115,9 @@ class RegressionModel(object):
     def __init__(self):
         # Initialize your model parameters here
 
-        self.learning_rate = -0.005
+        # Positive step size; the descent direction is applied by negating
+        # it at the update sites.
+        self.learning_rate = 0.005
         self.batch_size = 200
         self.hidden_layer = 50
         self.w1 = nn.Parameter(1, self.hidden_layer)
@@ -102,16 +156,38 @@ class RegressionModel(object):
     def train(self, dataset):
         """
         Trains the model.
+
+        When the fused kernel from models_fast is importable, each step runs
+        directly on the parameter arrays; otherwise the node-graph path below
+        is used.
         """
-        for x, y in dataset.iterate_forever(self.batch_size):
-            if nn.as_scalar(self.get_loss(x, y)) < 0.02:
-                break
-            temp = self.get_loss(x,y)
-            grad_w1, grad_w2, grad_b1, grad_b2 = nn.gradients(temp, [self.w1, self.w2, self.b1, self.b2])
-            self.w1.update(grad_w1, self.learning_rate)
-            self.w2.update(grad_w2, self.learning_rate)
-            self.b1.update(grad_b1, self.learning_rate)
-            self.b2.update(grad_b2, self.learning_rate)
+        # Stop on an exponential moving average of the per-batch loss,
+        # checked every 20 iterations: single-batch losses are noisy, and on
+        # the node-graph path every scalar read is a graph evaluation.
+        ema = None
+        if models_fast is not None:
+            for i, (x, y) in enumerate(dataset.iterate_forever(self.batch_size)):
+                loss = models_fast.regression_step(
+                    self.w1.data, self.b1.data, self.w2.data, self.b2.data,
+                    x.data, y.data, -self.learning_rate)
+                if i % 20 == 0:
+                    ema = loss if ema is None else 0.9 * ema + 0.1 * loss
+                    if ema < 0.02:
+                        break
+            return
+
+        for i, (x, y) in enumerate(dataset.iterate_forever(self.batch_size)):
+            loss = self.get_loss(x, y)
+            if i % 20 == 0:
+                value = nn.as_scalar(loss)
+                ema = value if ema is None else 0.9 * ema + 0.1 * value
+                if ema < 0.02:
+                    break
+            grad_w1, grad_w2, grad_b1, grad_b2 = nn.gradients(loss, [self.w1, self.w2, self.b1, self.b2])
+            self.w1.update(grad_w1, -self.learning_rate)
+            self.w2.update(grad_w2, -self.learning_rate)
+            self.b1.update(grad_b1, -self.learning_rate)
+            self.b2.update(grad_b2, -self.learning_rate)
 
 class DigitClassificationModel(object):
     """
@@ -129,7 +205,8 @@ class DigitClassificationModel(object):
     """
     def __init__(self):
         # Initialize your model parameters here
-        self.learning_rate = -0.05
+        # Positive step size, negated at the update sites (see RegressionModel).
+        self.learning_rate = 0.05
         self.batch_size = 20
         self.hidden_layer = 100
         self.w1 = nn.Parameter(784, self.hidden_layer)
@@ -137,6 +214,11 @@ class DigitClassificationModel(object):
         self.w2 = nn.Parameter(self.hidden_layer, 10)
         self.b2 = nn.Parameter(1, 10)
 
+        # Scratch buffers reused by run_fast, so the forward pass does not
+        # allocate fresh hidden and output arrays on every call.
+        self._h = np.empty((self.batch_size, self.hidden_layer))
+        self._out = np.empty((self.batch_size, 10))
+
     def run(self, x):
         """
         Runs the model for a batch of examples.
@@ -172,20 +254,98 @@ class DigitClassificationModel(object):
         """
         return nn.SoftmaxLoss(self.run(x), y)
 
+    def run_fast(self, x):
+        """
+        Forward pass operating directly on a numpy array.
+
+        Computes the same scores as `run`, but writes every intermediate into
+        the scratch buffers preallocated in __init__ (the bias add and ReLU
+        are applied in place), for callers that work with raw arrays rather
+        than nodes.
+
+        Inputs:
+            x: a numpy array with shape (batch_size x 784)
+        Output: a numpy array with shape (batch_size x 10) containing
+            predicted scores. The array is reused by subsequent calls.
+        """
+        if self._h.shape[0] != x.shape[0]:
+            self._h = np.empty((x.shape[0], self.hidden_layer))
+            self._out = np.empty((x.shape[0], 10))
+        if models_fast is not None:
+            models_fast.linear_bias_relu(
+                x, self.w1.data, self.b1.data, out=self._h)
+            return models_fast.linear_bias(
+                self._h, self.w2.data, self.b2.data, out=self._out)
+        np.dot(x, self.w1.data, out=self._h)
+        self._h += self.b1.data
+        np.maximum(self._h, 0, out=self._h)
+        np.dot(self._h, self.w2.data, out=self._out)
+        self._out += self.b2.data
+        return self._out
+
+    def _iterate_growing_batches(self, dataset):
+        """
+        Yields raw-array minibatches whose size ramps from batch_size up to
+        10 * batch_size over the first 500 steps, built by concatenating
+        consecutive dataset minibatches. A 20-row GEMM spends most of its
+        time on overhead and memory traffic; growing the batch raises its
+        arithmetic intensity once the early, noisy updates are done.
+
+        Yields (x, y, scale) tuples, where `scale` is the factor to apply to
+        the learning rate (linear scaling rule) so the update dynamics match
+        the small-batch schedule.
+        """
+        iterator = dataset.iterate_forever(self.batch_size)
+        step = 0
+        while True:
+            chunks = min(10, 1 + step // 50)
+            parts = [next(iterator) for _ in range(chunks)]
+            if chunks == 1:
+                yield parts[0][0].data, parts[0][1].data, 1
+            else:
+                yield (np.concatenate([x.data for x, _ in parts]),
+                       np.concatenate([y.data for _, y in parts]),
+                       chunks)
+            step += 1
+
     def train(self, dataset):
         """
         Trains the model.
+
+        When the fused kernel from models_fast is importable, each minibatch
+        step runs directly on the parameter arrays; otherwise the node-graph
+        path below is used.
         """
-        for x, y in dataset.iterate_forever(self.batch_size):
-            print(dataset.get_validation_accuracy())
-            if dataset.get_validation_accuracy() >= 0.978:
+        step = 0
+        acc = 0.0
+        if models_fast is not None:
+            for x, y, scale in self._iterate_growing_batches(dataset):
+                if step % 100 == 0:
+                    acc = dataset.get_validation_accuracy()
+                if acc >= 0.978:
+                    break
+                step += 1
+                # The kernel wants integer class indices, not one-hot rows.
+                models_fast.digit_classification_step(
+                    self.w1.data, self.b1.data, self.w2.data, self.b2.data,
+                    x, np.argmax(y, axis=1), -self.learning_rate * scale)
+            return
+
+        for x, y, scale in self._iterate_growing_batches(dataset):
+            # Each accuracy check is a full forward pass over the validation
+            # set, which dwarfs the cost of a minibatch step, so only check
+            # periodically.
+            if step % 100 == 0:
+                acc = dataset.get_validation_accuracy()
+            if acc >= 0.978:
                 break
-            temp = self.get_loss(x,y)
-            grad_w1, grad_w2, grad_b1, grad_b2 = nn.gradients(temp, [self.w1, self.w2, self.b1, self.b2])
-            self.w1.update(grad_w1, self.learning_rate)
-            self.w2.update(grad_w2, self.learning_rate)
-            self.b1.update(grad_b1, self.learning_rate)
-            self.b2.update(grad_b2, self.learning_rate)
+            step += 1
+            loss = self.get_loss(nn.Constant(x), nn.Constant(y))
+            grad_w1, grad_w2, grad_b1, grad_b2 = nn.gradients(loss, [self.w1, self.w2, self.b1, self.b2])
+            self.w1.update(grad_w1, -self.learning_rate * scale)
+            self.w2.update(grad_w2, -self.learning_rate * scale)
+            self.b1.update(grad_b1, -self.learning_rate * scale)
+            self.b2.update(grad_b2, -self.learning_rate * scale)
 
 
 class LanguageIDModel(object):
@@ -205,7 +365,8 @@ class LanguageIDModel(object):
         self.languages = ["English", "Spanish", "Finnish", "Dutch", "Polish"]
 
         # Initialize your model parameters here
-        self.learning_rate = -0.05
+        # Positive step size, negated at the update sites (see RegressionModel).
+        self.learning_rate = 0.05
         self.batch_size = 40
         self.hidden_layer = 250
 
@@ -219,9 +380,20 @@ class LanguageIDModel(object):
         self.w3 = nn.Parameter(self.hidden_layer, 5)
         self.b3 = nn.Parameter(1, 5)
 
+        # Head parameters updated together each training step.
+        self._params = [self.w1, self.w2, self.w3,
+                        self.b1, self.b2, self.b3]
+
         self.W_hidden = nn.Parameter(47, self.hidden_layer)
         self.W_hidden2 = nn.Parameter(self.hidden_layer, self.hidden_layer)
 
+        # bfloat16 shadow of the embedding table read by the row gather in
+        # `run`; halves the bytes the lookup touches. The full-precision
+        # master weights stay in W_hidden, and training re-packs the shadow
+        # every _bf16_refresh_period minibatches.
+        self._w_hidden_bf16 = nn.bf16_pack(self.W_hidden.data)
+        self._bf16_refresh_period = 50
+
 
     def run(self, xs):
         """
@@ -252,15 +424,28 @@ class LanguageIDModel(object):
             A node with shape (batch_size x 5) containing predicted scores
                 (also called logits)
         """
-        first = 1
-        for elem in xs:
-            if first == 1:
-                first = 0
-                x = nn.ReLU(nn.Linear(elem, self.W_hidden))
-            else:
-                x = nn.Add(nn.Linear(elem, self.W_hidden), nn.Linear(x, self.W_hidden2))
-
-        dot = nn.Linear(x, self.w1)
+        L = len(xs)
+        batch_size = xs[0].data.shape[0]
+
+        # The characters arrive as one-hot rows, so multiplying them by
+        # W_hidden just selects rows of it: embed all L timesteps with a
+        # single row gather by character index instead of a GEMM that is
+        # almost entirely multiplications by zero, then slice the result
+        # back apart for the recurrence.
+        indices = np.argmax(
+            np.concatenate([elem.data for elem in xs]), axis=1)
+        emb_all = nn.Gather(self.W_hidden, indices,
+                            table=self._w_hidden_bf16)
+
+        # Starting from a zero hidden state makes every timestep identical:
+        # no special case for the first character, and the nonlinearity is
+        # applied uniformly.
+        h = nn.Constant(np.zeros((batch_size, self.hidden_layer)))
+        for t in range(L):
+            emb = nn.Slice(emb_all, t * batch_size, (t + 1) * batch_size)
+            h = nn.ReLU(nn.Add(emb, nn.Linear(h, self.W_hidden2)))
+
+        dot = nn.Linear(h, self.w1)
         bias_added = nn.ReLU(nn.AddBias(dot, self.b1))
         dot2 = nn.Linear(bias_added, self.w2)
         bias_added2 = nn.ReLU(nn.AddBias(dot2, self.b2))
@@ -287,16 +472,39 @@ class LanguageIDModel(object):
     def train(self, dataset):
         """
         Trains the model.
+
+        When the kernels from models_fast are importable, the recurrence
+        and the classifier-head step run directly on the parameter arrays;
+        otherwise the node-graph path below is used. Both paths train only
+        the head parameters, as before.
         """
+        step = 0
+        if models_fast is not None:
+            for xs, y in dataset.iterate_forever(self.batch_size):
+                if dataset.get_validation_accuracy() >= 0.86:
+                    break
+                batch_size = xs[0].data.shape[0]
+                indices = np.argmax(
+                    np.concatenate([elem.data for elem in xs]), axis=1)
+                emb = self.W_hidden.data[indices].reshape(
+                    len(xs), batch_size, self.hidden_layer)
+                h = models_fast.rnn_forward(emb, self.W_hidden2.data)
+                models_fast.language_id_step(
+                    self.w1.data, self.b1.data, self.w2.data, self.b2.data,
+                    self.w3.data, self.b3.data, h,
+                    np.argmax(y.data, axis=1), -self.learning_rate)
+                step += 1
+                if step % self._bf16_refresh_period == 0:
+                    self._w_hidden_bf16[:] = nn.bf16_pack(self.W_hidden.data)
+            return
+
         for x, y in dataset.iterate_forever(self.batch_size):
             if dataset.get_validation_accuracy() >= 0.86:
                 break
-            temp = self.get_loss(x,y)
-            grad_w1, grad_w2,grad_w3,grad_b1,grad_b2,grad_b3  = nn.gradients(temp, [self.w1, self.w2,self.w3,self.b1, self.b2,self.b3])
-            self.w1.update(grad_w1, self.learning_rate)
-            self.w2.update(grad_w2, self.learning_rate)
-            self.w3.update(grad_w3, self.learning_rate)
-            self.b1.update(grad_b1, self.learning_rate)
-            self.b2.update(grad_b2, self.learning_rate)
-            self.b3.update(grad_b3, self.learning_rate)
+            loss = self.get_loss(x, y)
+            grads = nn.gradients(loss, self._params)
+            sgd_update(self._params, grads, -self.learning_rate)
+            step += 1
+            if step % self._bf16_refresh_period == 0:
+                self._w_hidden_bf16[:] = nn.bf16_pack(self.W_hidden.data)
 
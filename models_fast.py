@@ -0,0 +1,201 @@
+"""
+Optional fast training kernels that operate directly on numpy arrays.
+
+The models in `models.py` are small enough that the bookkeeping done by the
+`nn` node graph (node construction, gradient tape, per-op dispatch) costs far
+more than the arithmetic itself. The kernels here fuse an entire training
+step (forward pass, loss, backward pass, and parameter update) into a single
+function over the raw parameter arrays.
+
+Each kernel is compiled with numba when it is installed. When numba is not
+available the plain numpy definitions are used unchanged, so importing this
+module never requires numba.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorate(func):
+            return func
+        return decorate
+
+def linear_bias(x, w, b, out=None):
+    """
+    Computes x @ w + b, writing the matrix product into `out` when provided
+    and adding the bias in place, so the layer allocates nothing per call.
+
+    Note this cannot be used on the `nn` node-graph path: there the bias
+    gradient comes from the AddBias node, which an in-place add would skip.
+    """
+    out = np.dot(x, w, out=out)
+    out += b
+    return out
+
+def linear_bias_relu(x, w, b, out=None):
+    """
+    Fused linear layer: x @ w + b followed by an in-place ReLU.
+    """
+    out = linear_bias(x, w, b, out)
+    np.maximum(out, 0.0, out=out)
+    return out
+
+@njit(cache=True, fastmath=True)
+def regression_step(w1, b1, w2, b2, x, y, multiplier):
+    """
+    One fused training step for RegressionModel.
+
+    Computes the same square loss and gradients as the node-graph path
+    (Linear -> AddBias -> ReLU -> Linear -> AddBias -> SquareLoss), applies
+    the updates in place using the same sign convention as
+    nn.Parameter.update (param += multiplier * gradient), and returns the
+    scalar loss measured before the update.
+    """
+    h = np.dot(x, w1) + b1
+    a = np.maximum(h, 0.0)
+    predicted = np.dot(a, w2) + b2
+    diff = predicted - y
+    loss = np.mean(diff * diff) / 2.0
+
+    d = diff / diff.size
+    grad_w2 = np.dot(a.T, d)
+    grad_b2 = np.sum(d, axis=0).reshape(1, -1)
+    dh = np.where(h > 0.0, np.dot(d, w2.T), 0.0)
+    grad_w1 = np.dot(x.T, dh)
+    grad_b1 = np.sum(dh, axis=0).reshape(1, -1)
+
+    w1 += multiplier * grad_w1
+    b1 += multiplier * grad_b1
+    w2 += multiplier * grad_w2
+    b2 += multiplier * grad_b2
+    return loss
+
+@njit(cache=True, fastmath=True, parallel=True)
+def rnn_forward(emb, w_hidden2):
+    """
+    Runs the language-ID recurrence over a pre-embedded word batch.
+
+    `emb` is an (L x batch_size x hidden) tensor of character embeddings;
+    starting from a zero hidden state, each timestep computes
+    h = ReLU(emb[t] + h @ W_hidden2). Returns the final hidden state. With
+    numba the elementwise work is parallelized across the batch.
+    """
+    L, batch_size, hidden = emb.shape
+    h = np.zeros((batch_size, hidden))
+    for t in range(L):
+        h = np.maximum(0.0, emb[t] + np.dot(h, w_hidden2))
+    return h
+
+@njit(cache=True, fastmath=True)
+def language_id_step(w1, b1, w2, b2, w3, b3, h, y_idx, multiplier):
+    """
+    One fused training step for the LanguageIDModel classifier head.
+
+    Takes the final recurrent hidden state from `rnn_forward` and runs the
+    three-layer head forward, softmax cross-entropy against integer class
+    indices, backward, and in-place update in one kernel. Like the
+    node-graph training path, only the head parameters are updated; the
+    recurrent weights stay fixed, so no gradient flows back through the
+    recurrence. Uses the same update convention as nn.Parameter.update
+    (param += multiplier * gradient) and returns the scalar loss measured
+    before the update.
+    """
+    z1 = np.dot(h, w1) + b1
+    a1 = np.maximum(z1, 0.0)
+    z2 = np.dot(a1, w2) + b2
+    a2 = np.maximum(z2, 0.0)
+    logits = np.dot(a2, w3) + b3
+
+    batch_size, num_classes = logits.shape
+    loss = 0.0
+    d3 = np.empty_like(logits)
+    for i in range(batch_size):
+        row_max = logits[i, 0]
+        for j in range(1, num_classes):
+            if logits[i, j] > row_max:
+                row_max = logits[i, j]
+        total = 0.0
+        for j in range(num_classes):
+            e = np.exp(logits[i, j] - row_max)
+            d3[i, j] = e
+            total += e
+        log_total = np.log(total)
+        loss -= logits[i, y_idx[i]] - row_max - log_total
+        for j in range(num_classes):
+            d3[i, j] /= total * batch_size
+        d3[i, y_idx[i]] -= 1.0 / batch_size
+    loss /= batch_size
+
+    grad_w3 = np.dot(a2.T, d3)
+    grad_b3 = np.sum(d3, axis=0).reshape(1, -1)
+    d2 = np.where(z2 > 0.0, np.dot(d3, w3.T), 0.0)
+    grad_w2 = np.dot(a1.T, d2)
+    grad_b2 = np.sum(d2, axis=0).reshape(1, -1)
+    d1 = np.where(z1 > 0.0, np.dot(d2, w2.T), 0.0)
+    grad_w1 = np.dot(h.T, d1)
+    grad_b1 = np.sum(d1, axis=0).reshape(1, -1)
+
+    w1 += multiplier * grad_w1
+    b1 += multiplier * grad_b1
+    w2 += multiplier * grad_w2
+    b2 += multiplier * grad_b2
+    w3 += multiplier * grad_w3
+    b3 += multiplier * grad_b3
+    return loss
+
+@njit(cache=True, fastmath=True)
+def digit_classification_step(w1, b1, w2, b2, x, y_idx, multiplier):
+    """
+    One fused training step for DigitClassificationModel.
+
+    Runs the forward pass, a numerically stable softmax cross-entropy, the
+    backward pass, and the in-place parameter update as a single kernel.
+    The softmax, its gradient, and the loss share one pass over the logits.
+
+    Labels arrive as a 1-D array of integer class indices rather than a
+    one-hot matrix: the cross-entropy only reads one log-probability per
+    row, and its gradient is the softmax with 1 subtracted at the label
+    position, so the one-hot subtraction becomes a single scatter. Uses the
+    same update convention as nn.Parameter.update
+    (param += multiplier * gradient) and returns the scalar loss measured
+    before the update.
+    """
+    h = np.dot(x, w1) + b1
+    a = np.maximum(h, 0.0)
+    logits = np.dot(a, w2) + b2
+
+    batch_size, num_classes = logits.shape
+    loss = 0.0
+    d = np.empty_like(logits)
+    for i in range(batch_size):
+        row_max = logits[i, 0]
+        for j in range(1, num_classes):
+            if logits[i, j] > row_max:
+                row_max = logits[i, j]
+        total = 0.0
+        for j in range(num_classes):
+            e = np.exp(logits[i, j] - row_max)
+            d[i, j] = e
+            total += e
+        log_total = np.log(total)
+        loss -= logits[i, y_idx[i]] - row_max - log_total
+        for j in range(num_classes):
+            d[i, j] /= total * batch_size
+        d[i, y_idx[i]] -= 1.0 / batch_size
+    loss /= batch_size
+
+    grad_w2 = np.dot(a.T, d)
+    grad_b2 = np.sum(d, axis=0).reshape(1, -1)
+    dh = np.where(h > 0.0, np.dot(d, w2.T), 0.0)
+    grad_w1 = np.dot(x.T, dh)
+    grad_b1 = np.sum(dh, axis=0).reshape(1, -1)
+
+    w1 += multiplier * grad_w1
+    b1 += multiplier * grad_b1
+    w2 += multiplier * grad_w2
+    b2 += multiplier * grad_b2
+    return loss
@@ -3,6 +3,24 @@ import numpy as np
 def format_shape(shape):
     return "x".join(map(str, shape)) if shape else "()"
 
+def bf16_pack(data):
+    """
+    Packs a float array into bfloat16 storage.
+
+    The result is a uint16 array holding the upper half of each float32 bit
+    pattern, rounded to nearest (ties to even). This halves the bytes needed
+    to store a read-mostly table; unpacking with `bf16_unpack` is exact.
+    """
+    bits = np.ascontiguousarray(data, dtype=np.float32).view(np.uint32)
+    rounding_bias = ((bits >> np.uint32(16)) & np.uint32(1)) + np.uint32(0x7FFF)
+    return ((bits + rounding_bias) >> np.uint32(16)).astype(np.uint16)
+
+def bf16_unpack(packed):
+    """
+    Unpacks a uint16 array produced by `bf16_pack` into float32.
+    """
+    return (packed.astype(np.uint32) << np.uint32(16)).view(np.float32)
+
 class Node(object):
     def __repr__(self):
         return "<{} shape={} at {}>".format(
@@ -243,6 +261,102 @@ class ReLU(FunctionNode):
         assert gradient.shape == inputs[0].shape
         return [gradient * np.where(inputs[0] > 0, 1.0, 0.0)]
 
+class Gather(FunctionNode):
+    """
+    Selects rows of a weight matrix by index.
+
+    When the input features are one-hot vectors, `nn.Linear(x, weights)`
+    multiplies almost entirely by zeros; looking up the selected rows
+    directly moves only the data that contributes to the result. The
+    backward pass scatter-adds the incoming gradient into the corresponding
+    rows of the weight gradient, so training matches the equivalent Linear.
+
+    An optional `table` argument supplies a bfloat16-packed copy of the
+    weights (see `bf16_pack`) to read in the forward pass instead of the
+    full-precision data, halving the bytes moved by the lookup. Gradients
+    still flow to the full-precision weights node; the caller is responsible
+    for re-packing the table after updating them.
+
+    Usage: nn.Gather(weights, indices)
+    Inputs:
+        weights: a Node with shape (num_rows x num_features)
+        indices: a 1-D numpy integer array with values in [0, num_rows)
+        table: an optional uint16 array from `bf16_pack(weights.data)`
+    Output: a Node with shape (len(indices) x num_features)
+    """
+    def __init__(self, weights, indices, table=None):
+        assert isinstance(indices, np.ndarray) and indices.ndim == 1, (
+            "Indices must be a 1-D numpy array, instead got {!r}".format(
+                type(indices).__name__))
+        assert np.issubdtype(indices.dtype, np.integer), (
+            "Indices must be an integer array, instead has data type "
+            "{!r}".format(indices.dtype))
+        assert table is None or (
+            isinstance(table, np.ndarray)
+            and table.dtype == np.uint16
+            and table.shape == weights.data.shape), (
+            "Table must be a uint16 array matching the weights shape")
+        self.indices = indices
+        self.table = table
+        super().__init__(weights)
+
+    def _forward(self, *inputs):
+        assert len(inputs) == 1, "Expected 1 input, got {}".format(len(inputs))
+        assert inputs[0].ndim == 2, (
+            "Input should have 2 dimensions, instead has {}".format(
+                inputs[0].ndim))
+        if self.table is not None:
+            return bf16_unpack(self.table[self.indices])
+        return inputs[0][self.indices]
+
+    def _backward(self, gradient, *inputs):
+        assert gradient.shape == (self.indices.shape[0], inputs[0].shape[1])
+        result = np.zeros_like(inputs[0])
+        np.add.at(result, self.indices, gradient)
+        return [result]
+
+class Slice(FunctionNode):
+    """
+    Selects a contiguous block of rows from the input.
+
+    This is useful for batching several small matrix multiplications into a
+    single large one: stack the inputs, apply one `nn.Linear`, then slice the
+    result back apart. Gradients flow only into the selected rows.
+
+    Usage: nn.Slice(x, start, end)
+    Inputs:
+        x: a Node with shape (num_rows x num_features)
+        start: a Python integer, the first row to select
+        end: a Python integer, one past the last row to select
+    Output: a Node with shape ((end - start) x num_features)
+    """
+    def __init__(self, x, start, end):
+        assert isinstance(start, int) and isinstance(end, int), (
+            "Slice bounds must be Python integers, instead have types {!r} "
+            "and {!r}".format(type(start).__name__, type(end).__name__))
+        assert 0 <= start < end, (
+            "Slice bounds must satisfy 0 <= start < end, got start={} "
+            "end={}".format(start, end))
+        self.start = start
+        self.end = end
+        super().__init__(x)
+
+    def _forward(self, *inputs):
+        assert len(inputs) == 1, "Expected 1 input, got {}".format(len(inputs))
+        assert inputs[0].ndim == 2, (
+            "Input should have 2 dimensions, instead has {}".format(
+                inputs[0].ndim))
+        assert self.end <= inputs[0].shape[0], (
+            "Slice end {} is out of bounds for input with shape {}".format(
+                self.end, format_shape(inputs[0].shape)))
+        return inputs[0][self.start:self.end]
+
+    def _backward(self, gradient, *inputs):
+        assert gradient.shape == (self.end - self.start, inputs[0].shape[1])
+        result = np.zeros_like(inputs[0])
+        result[self.start:self.end] = gradient
+        return [result]
+
 class SquareLoss(FunctionNode):
     """
     This node first computes 0.5 * (a[i,j] - b[i,j])**2 at all positions (i,j)